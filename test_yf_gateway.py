@@ -0,0 +1,195 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+import requests
+
+import yf_gateway
+from yf_gateway import CIRCUIT_OPEN, EMPTY, FAILED, OK, Gateway, UpstreamError
+
+
+class FakeUpstream():
+    """Local HTTP server that replays a scripted list of status codes, then returns 200."""
+
+    def __init__(self, script=()):
+
+        self.script = list(script)
+        self.hits = []
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                upstream.hits.append(time.monotonic())
+                status = upstream.script.pop(0) if upstream.script else 200
+                body = b'{"rows": [1, 2, 3]}' if status == 200 else b'Too Many Requests'
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/quote'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def upstream():
+    server = FakeUpstream()
+    yield server
+    server.close()
+
+
+def make_gateway(**kwargs):
+
+    options = dict(rate=1000, burst=1000, concurrency=4, max_retries=3, base_delay=0.001, max_delay=0.01,
+                   breaker_threshold=3, breaker_reset=0.2, session=requests.Session())
+    options.update(kwargs)
+    return Gateway(**options)
+
+
+def get_rows(gateway, url):
+
+    response = gateway.session.get(url, timeout=5)
+    response.raise_for_status()
+    return response.json()['rows']
+
+
+def test_retries_through_transient_rate_limits(upstream):
+
+    upstream.script = [429, 429]
+    gateway = make_gateway()
+    result = gateway.fetch('quote', get_rows, gateway, upstream.url)
+    assert result.status == OK
+    assert result.data == [1, 2, 3]
+    assert result.attempts == 3
+    assert len(upstream.hits) == 3
+
+
+def test_failure_is_distinct_from_no_data(upstream):
+
+    upstream.script = [500] * 10
+    gateway = make_gateway(max_retries=1, breaker_threshold=10)
+    result = gateway.fetch('quote', get_rows, gateway, upstream.url)
+    assert result.status == FAILED
+    assert isinstance(result.error, requests.HTTPError)
+    with pytest.raises(UpstreamError):
+        result.unwrap()
+
+    assert gateway.fetch('empty', lambda: []).status == EMPTY
+
+
+def test_bugs_are_failures_not_no_data():
+
+    gateway = make_gateway(max_retries=0)
+
+    def broken():
+        raise TypeError('bug in our code')
+
+    result = gateway.fetch('broken', broken)
+    assert result.status == FAILED
+    assert gateway.breaker('broken').failures == 1
+
+
+def test_breaker_opens_fails_fast_and_recovers(upstream):
+
+    upstream.script = [503] * 3
+    gateway = make_gateway(max_retries=5, breaker_threshold=3)
+    result = gateway.fetch('quote', get_rows, gateway, upstream.url)
+    assert result.status == CIRCUIT_OPEN
+    assert len(upstream.hits) == 3
+
+    # While open, calls never reach the server
+    assert gateway.fetch('quote', get_rows, gateway, upstream.url).status == CIRCUIT_OPEN
+    assert len(upstream.hits) == 3
+
+    time.sleep(0.25)
+    assert gateway.fetch('quote', get_rows, gateway, upstream.url).status == OK
+    assert gateway.breaker('quote').state == 'closed'
+
+
+def test_token_bucket_caps_throughput(upstream):
+
+    gateway = make_gateway(rate=50, burst=5)
+    threads = [threading.Thread(target=gateway.fetch, args=('quote', get_rows, gateway, upstream.url))
+               for _ in range(25)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 5 calls ride the burst, the other 20 are paced at 50/s
+    assert time.monotonic() - start >= 20 / 50 * 0.9
+    assert len(upstream.hits) == 25
+
+
+def download_frame(tickers):
+
+    # Same shape as yf.download(group_by='column'): (Price, Ticker) columns
+    columns = pd.MultiIndex.from_product([['Close', 'Volume'], tickers], names=['Price', 'Ticker'])
+    return pd.DataFrame(1.0, index=pd.date_range('2024-01-01', periods=3, name='Date'), columns=columns)
+
+
+def test_download_errors_are_failures(monkeypatch):
+
+    def fake_download(tickers, **kwargs):
+        # yf.download records per-ticker errors instead of raising
+        yf_gateway.yf_shared._ERRORS = {'MSFT': "YFRateLimitError('Too Many Requests. Rate limited. Try after a while.')"}
+        return download_frame(tickers)
+
+    monkeypatch.setattr(yf_gateway.yf, 'download', fake_download)
+    gateway = make_gateway(max_retries=1)
+    result = gateway.download(tickers=['MSFT'])
+    assert result.status == FAILED
+    assert result.attempts == 2
+    assert list(result.errors) == ['MSFT']
+
+
+def test_download_retries_only_rate_limited_tickers(monkeypatch):
+
+    calls = []
+
+    def fake_download(tickers, **kwargs):
+        calls.append((list(tickers), kwargs['threads']))
+        errors = {}
+        if 'DEAD' in tickers:
+            errors['DEAD'] = "YFPricesMissingError('$DEAD: possibly delisted; no price data found  (period=1y)')"
+        if 'MSFT' in tickers and sum('MSFT' in c for c, _ in calls) == 1:
+            errors['MSFT'] = "YFRateLimitError('Too Many Requests. Rate limited. Try after a while.')"
+        yf_gateway.yf_shared._ERRORS = errors
+        return download_frame(tickers)
+
+    monkeypatch.setattr(yf_gateway.yf, 'download', fake_download)
+    gateway = make_gateway(burst=2)
+    result = gateway.download(tickers=['AAPL', 'DEAD', 'MSFT'])
+
+    # Chunks of burst size without yfinance's own thread pool; the missing ticker is not retried
+    assert calls == [(['AAPL', 'DEAD'], False), (['MSFT'], False), (['MSFT'], False)]
+    assert result.status == OK
+    assert list(result.missing) == ['DEAD']
+    assert result.errors == {}
+    assert sorted(result.data['Close'].columns) == ['AAPL', 'DEAD', 'MSFT']
+    assert gateway.breaker('download').state == 'closed'
+
+
+def test_download_with_only_missing_tickers_is_empty(monkeypatch):
+
+    def fake_download(tickers, **kwargs):
+        yf_gateway.yf_shared._ERRORS = {t: f"YFTzMissingError('${t}: possibly delisted; no timezone found')" for t in tickers}
+        return pd.DataFrame()
+
+    monkeypatch.setattr(yf_gateway.yf, 'download', fake_download)
+    result = make_gateway().download(tickers='DEAD GONE')
+    assert result.status == EMPTY
+    assert result.attempts == 1
+    assert sorted(result.missing) == ['DEAD', 'GONE']
@@ -0,0 +1,223 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from yf_gateway import gateway
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ['ewma', 'sma']
+METRICS = ['Total Return', 'CAGR', 'Sharpe', 'Max Drawdown', 'Hit Rate', 'Trades', 'Turnover']
+
+# Upper bound on dates x symbols x windows cells per task (~64MB per float64 tensor)
+MAX_CELLS = 8_000_000
+
+
+def load_closes(symbols, timeframe='10y'):
+    """
+    Daily closes as a dates x symbols frame, oldest first.
+
+    Symbols with no price data are left out and listed in attrs['dropped']. Symbols that still
+    fail after the gateway's retries raise DownloadError rather than quietly shrinking the universe.
+    """
+
+    symbols = [s.upper() for s in symbols]
+    result = gateway.download(tickers=symbols, period=timeframe, progress=False)
+    if result.errors:
+        raise result.error
+    dropped = sorted(result.missing)
+    if dropped:
+        logger.warning("Dropping %d symbol(s) with no price data: %s", len(dropped), ', '.join(dropped))
+    symbols = [s for s in symbols if s not in result.missing]
+    closes = pd.DataFrame()
+    if symbols:
+        data = result.unwrap()
+        closes = data['Close'] if 'Close' in data else data
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(name=symbols[0])
+        closes = closes.drop(columns=[c for c in closes.columns if c in result.missing]).sort_index()
+    closes.attrs['dropped'] = dropped
+    return closes
+
+
+def moving_averages(prices, windows, strategy='ewma'):
+    """(T, S) prices -> (T, S, P) moving averages, matching pandas ewm(adjust=False) / rolling(w).mean()."""
+
+    T, S = prices.shape
+    windows = np.asarray(windows)
+
+    if strategy == 'ewma':
+        alpha = 2.0 / (windows + 1.0)
+        out = np.empty((T, S, len(windows)))
+        ma = np.full((S, len(windows)), np.nan)
+        for t in range(T):
+            x = prices[t][:, None]
+            ma = np.where(np.isnan(ma), x, ma + alpha * (x - ma))
+            out[t] = ma
+        return out
+
+    if strategy == 'sma':
+        valid = ~np.isnan(prices)
+        csum = np.vstack([np.zeros((1, S)), np.cumsum(np.where(valid, prices, 0.0), axis=0)])
+        ccount = np.vstack([np.zeros((1, S)), np.cumsum(valid, axis=0)])
+        out = np.full((T, S, len(windows)), np.nan)
+        for p, w in enumerate(windows):
+            if w > T:
+                continue
+            total = csum[w:] - csum[:-w]
+            full = (ccount[w:] - ccount[:-w]) == w
+            out[w - 1:, :, p] = np.where(full, total / w, np.nan)
+        return out
+
+    raise ValueError(f"Unknown strategy {strategy!r}, expected one of {STRATEGIES}")
+
+
+def positions(prices, averages):
+    """
+    Long/flat positions from the short_term_moving / long_term_moving crossover rule.
+
+    Buy when the close crosses above its average, sell when it crosses below, and hold in between.
+    """
+
+    close = prices[:, :, None]
+    prev = np.vstack([np.full((1,) + prices.shape[1:], np.nan), prices[:-1]])[:, :, None]
+    buy = (close > averages) & (prev <= averages)
+    sell = (close < averages) & (prev >= averages)
+    events = buy.astype(np.int8) - sell.astype(np.int8)
+
+    # Forward-fill the last event along time
+    T = len(prices)
+    idx = np.where(events != 0, np.arange(T, dtype=np.int32)[:, None, None], np.int32(0))
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    last = np.take_along_axis(events, idx, axis=0)
+    return last == 1
+
+
+def evaluate(prices, windows, strategy='ewma', cost_bps=0.0, periods_per_year=252):
+    """Backtest every (symbol, window) pair at once; returns a dict of (S, P) metric arrays."""
+
+    prices = pd.DataFrame(prices).ffill().to_numpy(dtype=np.float64)
+    T, S = prices.shape
+    P = len(windows)
+
+    pos = positions(prices, moving_averages(prices, windows, strategy))
+    held = np.vstack([np.zeros((1, S, P), dtype=bool), pos[:-1]])  # trade on the signal bar's close
+
+    bar_ret = np.zeros((T, S))
+    bar_ret[1:] = prices[1:] / prices[:-1] - 1
+    bar_ret = np.nan_to_num(bar_ret)
+    trades = np.diff(pos.astype(np.int8), axis=0, prepend=0) != 0
+    strat_ret = np.where(held, bar_ret[:, :, None], 0.0) - trades * (cost_bps / 10_000)
+
+    log_ret = np.log1p(strat_ret)
+    equity = np.exp(np.cumsum(log_ret, axis=0))
+    total = equity[-1] - 1
+    years = max(T / periods_per_year, 1e-9)
+    drawdown = 1 - equity / np.maximum.accumulate(np.maximum(equity, 1.0), axis=0)
+
+    std = strat_ret.std(axis=0)
+    sharpe = np.divide(strat_ret.mean(axis=0), std, out=np.zeros_like(std), where=std > 0) * np.sqrt(periods_per_year)
+
+    # Per-trade returns: number entries along time and sum held log returns by trade id
+    entries = pos & ~held
+    n_trades = entries.sum(axis=0)
+    trade_no = np.cumsum(entries, axis=0, dtype=np.int32)
+    offsets = (np.cumsum(n_trades.ravel()) - n_trades.ravel()).reshape(S, P)
+    in_trade = held & (trade_no > 0)
+    trade_ids = (offsets[None] + trade_no - 1)[in_trade]
+    trade_ret = np.bincount(trade_ids, weights=log_ret[in_trade], minlength=int(n_trades.sum()))
+    trade_col = np.repeat(np.arange(S * P), n_trades.ravel())
+    wins = np.bincount(trade_col, weights=trade_ret > 0, minlength=S * P).reshape(S, P)
+
+    return {
+        'Total Return': total,
+        'CAGR': np.power(np.maximum(equity[-1], 0.0), 1 / years) - 1,
+        'Sharpe': sharpe,
+        'Max Drawdown': drawdown.max(axis=0),
+        'Hit Rate': np.divide(wins, n_trades, out=np.zeros((S, P)), where=n_trades > 0),
+        'Trades': n_trades,
+        'Turnover': trades.sum(axis=0) / years,
+    }
+
+
+def _run_block(args):
+
+    prices, windows, strategy, cost_bps, periods_per_year = args
+    return evaluate(prices, windows, strategy, cost_bps, periods_per_year)
+
+
+def _blocks(T, S, P, max_cells):
+
+    # Split windows first, then symbols, until each block fits in max_cells
+    per_window = max(T * S, 1)
+    p_step = max(1, min(P, max_cells // per_window))
+    s_step = S if p_step > 1 or T * S <= max_cells else max(1, max_cells // max(T, 1))
+    for s0 in range(0, S, s_step):
+        for p0 in range(0, P, p_step):
+            yield slice(s0, s0 + s_step), slice(p0, p0 + p_step)
+
+
+def backtest(closes, windows=(15, 200), strategy='ewma', cost_bps=0.0, periods_per_year=252,
+             workers=None, max_cells=MAX_CELLS):
+    """
+    Sweep a moving-average crossover strategy over symbols x windows.
+
+    closes is a dates x symbols frame (see load_closes). Returns one row per (symbol, window).
+    Large grids are split into blocks and spread over a process pool. Symbols with fewer than two
+    prices are dropped rather than scored as zero and, with any load_closes left out, listed in the
+    result's attrs['dropped'].
+    """
+
+    closes = closes.sort_index()
+    # load_closes reports the symbols it already left out in attrs['dropped']
+    dropped = list(closes.attrs.get('dropped', []))
+    short = [c for c, n in closes.count().items() if n < 2]
+    if short:
+        logger.warning("Dropping %d symbol(s) with no price history: %s", len(short), ', '.join(map(str, short)))
+        closes = closes.drop(columns=short)
+        dropped += short
+    symbols = list(closes.columns)
+    windows = list(windows)
+    prices = closes.to_numpy(dtype=np.float64)
+    T, S, P = prices.shape[0], prices.shape[1], len(windows)
+    if S == 0 or P == 0:
+        df = pd.DataFrame(columns=['Symbol', 'Strategy', 'Window'] + METRICS)
+        df.attrs['dropped'] = dropped
+        return df
+
+    blocks = list(_blocks(T, S, P, max_cells))
+    tasks = [(prices[:, s], windows[p], strategy, cost_bps, periods_per_year) for s, p in blocks]
+    workers = workers or os.cpu_count() or 1
+
+    if len(tasks) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(_run_block, tasks))
+    else:
+        results = [_run_block(task) for task in tasks]
+
+    grid = {name: np.zeros((S, P)) for name in METRICS}
+    for (s, p), result in zip(blocks, results):
+        for name in METRICS:
+            grid[name][s, p] = result[name]
+
+    df = pd.DataFrame({
+        'Symbol': np.repeat(symbols, P),
+        'Strategy': strategy,
+        'Window': np.tile(windows, S),
+    })
+    for name in METRICS:
+        df[name] = grid[name].ravel()
+    df['Trades'] = df['Trades'].astype(int)
+    df.attrs['dropped'] = dropped
+    return df
+
+
+def summary(results):
+    """Average each metric across symbols for every (strategy, window), best Sharpe first."""
+
+    return (results.groupby(['Strategy', 'Window'])[METRICS].mean()
+            .sort_values(by='Sharpe', ascending=False)
+            .reset_index())
@@ -0,0 +1,304 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import pandas as pd
+import plotly.io as pio
+
+from yf_gateway import TokenBucket, gateway
+from yf_utils import TickerAnalysis
+
+ARTIFACTS_DIR = os.getenv("PALADIN_ARTIFACTS", "artifacts")
+
+FRAMES = ['history', 'info', 'volatility', 'analyst_recommendations', 'upgrades_downgrades', 'news',
+          'insider_transactions', 'institutional_holders', 'fund_holdings', 'sec_filings']
+FIGURES = ['candlestick', 'volatility', 'short_term', 'long_term']
+SUCCESS_MARKER = '_SUCCESS'
+# Artifacts older than this are ignored by the app (seconds; default 36h covers a nightly job)
+MAX_AGE = float(os.getenv("PALADIN_ARTIFACTS_MAX_AGE", str(36 * 3600)))
+
+
+def ticker_bundle(y, symbol, timeframe, interval='1d'):
+    """Everything the Ticker Analysis page shows for one symbol, fetching the price history once."""
+
+    history = y.ticker_history(symbol=symbol, timeframe=timeframe, interval=interval)
+    frames = {
+        'history': history,
+        'info': y.ticker_info(symbol=symbol),
+        'volatility': y.volatility(symbol=symbol, history=history),
+        'analyst_recommendations': y.analyst_reccomendations(symbol=symbol),
+        'upgrades_downgrades': y.upgrades_downgrades(symbol=symbol),
+        'news': y.ticker_news(symbol=symbol),
+        'insider_transactions': y.insider_transactions(symbol=symbol),
+        'institutional_holders': y.insitutional_holders(symbol=symbol),
+        'fund_holdings': y.fund_holdings(symbol=symbol),
+        'sec_filings': y.sec_filings(symbol=symbol),
+    }
+    figures = {
+        'candlestick': y.candlestick(symbol=symbol, history=history),
+        'volatility': y.volatility_plot(symbol=symbol, history=history),
+        'short_term': y.short_term_moving(symbol=symbol, history=history),
+        'long_term': y.long_term_moving(symbol=symbol, history=history),
+    }
+    return {
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'frames': frames,
+        'figures': figures,
+        'analyst_price_targets': y.analyst_price_targets(symbol=symbol),
+        'report': None,
+        'built_at': None,
+    }
+
+
+def report_prompt(bundle):
+
+    frames = bundle['frames']
+    info = frames['info']
+    symbol = bundle['symbol']
+    ticker_name = info.loc[info['attributes'] == 'longName', f'{symbol}'].values[0]
+    news = frames['news']
+    news_list = news['Summary'].tolist() if news is not None and 'Summary' in news.columns else []
+
+    return f'''
+
+        Given the following ticker {symbol},
+        and associated company {ticker_name},
+        the historical trends {frames['history']},
+        core info: {info},
+        price_targets: {bundle['analyst_price_targets']},
+        analyst_reccomendations: {frames['analyst_recommendations']},
+        upgrades and downgrades: {frames['upgrades_downgrades']},
+        latest_news: {news_list},
+        volatility_measurements: {frames['volatility']}, and
+        insider_transactions: {frames['insider_transactions']}
+
+        Please develop an incredibly detailed investment report detailing insights from all of the above,
+        especially the news, and provide a reccomendation for buying, holding, and selling.
+
+        '''
+
+
+def artifact_path(symbol, timeframe, root=None):
+
+    return os.path.join(root or ARTIFACTS_DIR, timeframe, symbol.upper())
+
+
+def write_frame(df, path):
+
+    try:
+        df.to_parquet(path)
+    except (ValueError, TypeError):
+        # yfinance frames often hold mixed-type object columns that Arrow refuses
+        df = df.copy()
+        df.columns = df.columns.map(str)
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].astype(str)
+        df.to_parquet(path)
+
+
+def invalidate_artifacts(symbol, timeframe, root=None):
+
+    marker = os.path.join(artifact_path(symbol, timeframe, root), SUCCESS_MARKER)
+    if os.path.exists(marker):
+        os.remove(marker)
+
+
+def write_artifacts(bundle, root=None):
+    """Write a bundle into a fresh directory and swap it into place, so no stale files survive."""
+
+    final = artifact_path(bundle['symbol'], bundle['timeframe'], root)
+    path = f'{final}.tmp-{os.getpid()}'
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(os.path.join(path, 'figures'))
+
+    for name, df in bundle['frames'].items():
+        if isinstance(df, pd.DataFrame):
+            write_frame(df, os.path.join(path, f'{name}.parquet'))
+    for name, fig in bundle['figures'].items():
+        with open(os.path.join(path, 'figures', f'{name}.json'), 'w') as f:
+            f.write(fig.to_json())
+    with open(os.path.join(path, 'analyst_price_targets.json'), 'w') as f:
+        json.dump(bundle['analyst_price_targets'], f, default=str)
+    if bundle['report']:
+        with open(os.path.join(path, 'report.md'), 'w') as f:
+            f.write(bundle['report'])
+
+    with open(os.path.join(path, SUCCESS_MARKER), 'w') as f:
+        f.write(datetime.now(timezone.utc).isoformat())
+
+    # A crash between the renames leaves no directory at all, which the next run rebuilds
+    old = f'{final}.old-{os.getpid()}'
+    if os.path.exists(final):
+        os.rename(final, old)
+    os.rename(path, final)
+    shutil.rmtree(old, ignore_errors=True)
+    return final
+
+
+def artifact_built_at(symbol, timeframe, root=None):
+
+    marker = os.path.join(artifact_path(symbol, timeframe, root), SUCCESS_MARKER)
+    if not os.path.exists(marker):
+        return None
+    with open(marker) as f:
+        return datetime.fromisoformat(f.read().strip())
+
+
+def is_fresh(built_at, max_age=MAX_AGE):
+
+    return max_age is None or (datetime.now(timezone.utc) - built_at).total_seconds() <= max_age
+
+
+def load_artifacts(symbol, timeframe, root=None, max_age=MAX_AGE):
+    """Load a precomputed bundle, or None if there is no complete one younger than max_age seconds."""
+
+    # The batch writes symbols upper-case, and report_prompt looks the symbol up in the info frame
+    symbol = symbol.strip().upper()
+    path = artifact_path(symbol, timeframe, root)
+    built_at = artifact_built_at(symbol, timeframe, root)
+    if built_at is None or not is_fresh(built_at, max_age):
+        return None
+
+    frames = {}
+    for name in FRAMES:
+        file = os.path.join(path, f'{name}.parquet')
+        frames[name] = pd.read_parquet(file) if os.path.exists(file) else None
+    figures = {}
+    for name in FIGURES:
+        with open(os.path.join(path, 'figures', f'{name}.json')) as f:
+            figures[name] = pio.from_json(f.read())
+    with open(os.path.join(path, 'analyst_price_targets.json')) as f:
+        price_targets = json.load(f)
+    report = None
+    if os.path.exists(os.path.join(path, 'report.md')):
+        with open(os.path.join(path, 'report.md')) as f:
+            report = f.read()
+
+    return {
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'frames': frames,
+        'figures': figures,
+        'analyst_price_targets': price_targets,
+        'report': report,
+        'built_at': built_at,
+    }
+
+
+def read_watchlist(path):
+
+    if path.endswith('.csv'):
+        df = pd.read_csv(path)
+        column = 'Symbol' if 'Symbol' in df.columns else df.columns[0]
+        symbols = df[column].dropna().astype(str).tolist()
+    else:
+        with open(path) as f:
+            symbols = [line.split('#')[0] for line in f]
+    symbols = [s.strip().upper() for s in symbols if s.strip()]
+    return list(dict.fromkeys(symbols))
+
+
+def _init_worker(workers):
+
+    # Each process gets its own gateway, so split the upstream budget between them
+    gateway.bucket = TokenBucket(gateway.bucket.rate / workers, max(1, gateway.bucket.capacity // workers))
+
+
+def run_symbol(symbol, timeframe, root, with_llm, model):
+    """Build one symbol. Never raises, so one bad symbol cannot break the pool."""
+
+    start = time.perf_counter()
+    try:
+        # Whatever happens next, the old artifacts no longer count as complete
+        invalidate_artifacts(symbol, timeframe, root)
+        y = TickerAnalysis()
+        bundle = ticker_bundle(y, symbol, timeframe)
+        if with_llm:
+            bundle['report'] = ''.join(y.llm(model=model, prompt=report_prompt(bundle)))
+        write_artifacts(bundle, root)
+    except Exception as e:
+        return {
+            'symbol': symbol,
+            'ok': False,
+            'elapsed': time.perf_counter() - start,
+            'error': repr(e),
+            'traceback': ''.join(traceback.format_exception(type(e), e, e.__traceback__)),
+        }
+    return {'symbol': symbol, 'ok': True, 'elapsed': time.perf_counter() - start}
+
+
+def log_failure(root, symbol, timeframe, error, tb):
+
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, 'failures.jsonl'), 'a') as f:
+        f.write(json.dumps({
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'error': error,
+            'traceback': tb,
+            'time': datetime.now(timezone.utc).isoformat(),
+        }) + '\n')
+
+
+def run_batch(symbols, timeframe='1y', root=None, workers=4, with_llm=False, model='llama3.2', force=False):
+
+    root = root or ARTIFACTS_DIR
+    todo = []
+    for s in symbols:
+        built_at = artifact_built_at(s, timeframe, root)
+        if force or built_at is None or not is_fresh(built_at):
+            todo.append(s)
+    skipped = len(symbols) - len(todo)
+    if skipped:
+        print(f"Skipping {skipped} symbol(s) with fresh artifacts for {timeframe}")
+
+    done, failed = 0, 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(workers,)) as pool:
+        futures = {pool.submit(run_symbol, s, timeframe, root, with_llm, model): s for s in todo}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                # Only reached if the worker process itself died
+                outcome = {'symbol': symbol, 'ok': False, 'error': repr(e),
+                           'traceback': ''.join(traceback.format_exception(type(e), e, e.__traceback__))}
+            if outcome['ok']:
+                done += 1
+                print(f"[{done + failed}/{len(todo)}] {symbol} ok ({outcome['elapsed']:.1f}s)")
+            else:
+                failed += 1
+                log_failure(root, symbol, timeframe, outcome['error'], outcome['traceback'])
+                print(f"[{done + failed}/{len(todo)}] {symbol} failed: {outcome['error']}")
+
+    print(f"Finished: {done} built, {failed} failed, {skipped} skipped")
+    return done, failed, skipped
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Precompute Ticker Analysis artifacts for a watchlist.')
+    parser.add_argument('watchlist', help='text file with one symbol per line, or a CSV with a Symbol column')
+    parser.add_argument('--timeframe', default='1y')
+    parser.add_argument('--out', default=ARTIFACTS_DIR, help='artifact root directory')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--llm', action='store_true', help='also generate the AI investment report')
+    parser.add_argument('--model', default='llama3.2')
+    parser.add_argument('--force', action='store_true', help='rebuild symbols that already have artifacts')
+    args = parser.parse_args(argv)
+
+    symbols = read_watchlist(args.watchlist)
+    _, failed, _ = run_batch(symbols, timeframe=args.timeframe, root=args.out, workers=args.workers,
+                             with_llm=args.llm, model=args.model, force=args.force)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
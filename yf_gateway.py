@@ -0,0 +1,385 @@
+import logging
+import os
+import random
+import threading
+import time
+
+import pandas as pd
+import yfinance as yf
+from yfinance import shared as yf_shared
+
+from yf_metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+OK = 'ok'
+EMPTY = 'empty'
+FAILED = 'failed'
+CIRCUIT_OPEN = 'circuit_open'
+
+
+def _yf_exceptions(*names):
+
+    module = getattr(yf, 'exceptions', None)
+    return tuple(getattr(module, name) for name in names if hasattr(module, name))
+
+
+# yfinance raises these when a symbol simply has no such data (YFTickerMissingError covers missing
+# prices, timezones and earnings dates). Retrying will not change the answer, so they count as
+# "no data" rather than failures. Anything else, including rate limits, is a failure.
+NO_DATA_ERRORS = _yf_exceptions('YFDataException', 'YFTickerMissingError', 'YFNotImplementedError')
+
+
+def _class_names(classes):
+
+    names = set()
+    for cls in classes:
+        names.add(cls.__name__)
+        names |= _class_names(cls.__subclasses__())
+    return names
+
+
+_NO_DATA_NAMES = _class_names(NO_DATA_ERRORS)
+
+
+def is_missing_data(message):
+    """True if a yf.download error string (the repr of the exception) means the ticker has no such data."""
+
+    return message.split('(', 1)[0] in _NO_DATA_NAMES or 'possibly delisted' in message
+
+
+class DownloadError(Exception):
+    """Tickers that yf.download could not fetch after retries, with their error messages."""
+
+    def __init__(self, errors):
+
+        self.errors = errors  # ticker -> error message
+        super().__init__(errors)
+
+
+def is_empty(data):
+
+    if data is None:
+        return True
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return data.empty
+    if isinstance(data, (list, tuple, dict, str)):
+        return len(data) == 0
+    return False
+
+
+class UpstreamError(Exception):
+
+    def __init__(self, result):
+
+        self.result = result
+        super().__init__(f"{result.endpoint} {result.status} after {result.attempts} attempt(s): {result.error}")
+
+    def __reduce__(self):
+
+        # Exception pickling replays args into __init__, and the result's data or error may not
+        # pickle at all, so ship a plain copy across process boundaries
+        r = self.result
+        error = None if r.error is None else str(r.error)
+        return (UpstreamError, (Result(r.endpoint, r.status, error=error, attempts=r.attempts, elapsed_ms=r.elapsed_ms),))
+
+
+class Result():
+    """Outcome of one gateway call: ok, empty (no data), failed or circuit_open."""
+
+    def __init__(self, endpoint, status, data=None, error=None, attempts=0, elapsed_ms=0.0, missing=None, errors=None):
+
+        self.endpoint = endpoint
+        self.status = status
+        self.data = data
+        self.error = error
+        self.attempts = attempts
+        self.elapsed_ms = elapsed_ms
+        # Downloads only: ticker -> message for tickers with no data, and for tickers that still failed after retries
+        self.missing = missing or {}
+        self.errors = errors or {}
+
+    @property
+    def ok(self):
+        return self.status == OK
+
+    @property
+    def empty(self):
+        return self.status == EMPTY
+
+    @property
+    def failed(self):
+        return self.status in (FAILED, CIRCUIT_OPEN)
+
+    def raise_for_status(self):
+
+        if self.failed:
+            raise UpstreamError(self)
+        return self
+
+    def unwrap(self, default=None):
+        """Return the data, default when there is none, or raise UpstreamError if the call failed."""
+
+        self.raise_for_status()
+        return default if self.data is None else self.data
+
+    def __repr__(self):
+        return f"Result(endpoint={self.endpoint!r}, status={self.status!r}, attempts={self.attempts})"
+
+
+class TokenBucket():
+
+    def __init__(self, rate, burst):
+
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker():
+
+    def __init__(self, threshold=5, reset_timeout=30.0):
+
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._probing = False
+            if self.state == 'half_open' and not self._probing:
+                # Let a single probe through; everyone else fails fast until it reports back
+                self._probing = True
+                return True
+            return False
+
+    def success(self):
+
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._probing = False
+
+    def failure(self):
+
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == 'half_open' or self.failures >= self.threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+def _merge_downloads(frames):
+
+    # A retried ticker appears in several chunk frames; keep its most recent columns
+    frames = [frame for frame in frames if len(frame.columns)]
+    if not frames:
+        return pd.DataFrame()
+    if any('Ticker' not in (frame.columns.names or []) for frame in frames):
+        return frames[-1]
+    seen = set()
+    merged = []
+    for frame in reversed(frames):
+        tickers = set(frame.columns.get_level_values('Ticker'))
+        merged.append(frame.drop(columns=list(tickers & seen), level='Ticker'))
+        seen |= tickers
+    return pd.concat(merged[::-1], axis=1, sort=True)
+
+
+class Gateway():
+    """Single choke point for upstream calls: token bucket, bounded concurrency, retries, breakers."""
+
+    def __init__(self, rate=None, burst=None, concurrency=None, max_retries=None,
+                 base_delay=0.5, max_delay=8.0, breaker_threshold=5, breaker_reset=30.0, session=None):
+
+        rate = rate or float(os.getenv("PALADIN_UPSTREAM_RATE", "2"))
+        burst = burst or int(os.getenv("PALADIN_UPSTREAM_BURST", "5"))
+        concurrency = concurrency or int(os.getenv("PALADIN_UPSTREAM_CONCURRENCY", "4"))
+
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("PALADIN_UPSTREAM_RETRIES", "3"))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.breakers = {}
+        self._lock = threading.Lock()
+        self._download_lock = threading.Lock()
+        # HTTP session handed to every yfinance object; None lets yfinance build its own
+        self.session = session
+
+    # --- yfinance objects bound to the gateway's session -------------------
+
+    def ticker(self, symbol):
+        return yf.Ticker(symbol, session=self.session)
+
+    def sector(self, key):
+        return yf.Sector(key=key, session=self.session)
+
+    def industry(self, key):
+        return yf.Industry(key=key, session=self.session)
+
+    def market(self, market):
+        return yf.Market(market=market, session=self.session)
+
+    def search(self, query):
+        return yf.Search(query=query, session=self.session)
+
+    def download(self, tickers, chunk_size=None, **kwargs):
+        """
+        yf.download through the gateway. Returns a Result holding whatever data came back.
+
+        yf.download records per-ticker errors instead of raising. Tickers with no such data go in
+        result.missing and are not retried; only rate-limited or network-failed tickers are retried,
+        and those still failing end up in result.errors. Tickers are fetched in chunks with
+        threads=False and one token each, so a large universe cannot outrun the token bucket.
+        """
+
+        endpoint = 'download'
+        if isinstance(tickers, str):
+            tickers = tickers.replace(',', ' ').split()
+        tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        chunk_size = chunk_size or max(1, int(self.bucket.capacity))
+        kwargs['threads'] = False
+        breaker = self.breaker(endpoint)
+        start = time.perf_counter()
+        frames, missing, errors = [], {}, {}
+        attempts = 0
+        circuit_open = False
+        pending = tickers
+
+        for attempt in range(self.max_retries + 1):
+            errors = {}
+            for i in range(0, len(pending), chunk_size):
+                chunk = pending[i:i + chunk_size]
+                if not breaker.allow():
+                    circuit_open = True
+                    errors.update((t, 'circuit open') for t in pending[i:])
+                    break
+                for _ in chunk:
+                    self.bucket.acquire()
+                attempts += 1
+                # download() resets and fills the module-global _ERRORS per call, so calls are
+                # serialised to keep each call's errors its own
+                with self._slots, self._download_lock:
+                    try:
+                        data = yf.download(tickers=chunk, session=self.session, **kwargs)
+                        chunk_errors = dict(getattr(yf_shared, '_ERRORS', None) or {})
+                    except Exception as e:
+                        data = None
+                        chunk_errors = {t: repr(e) for t in chunk}
+                failed = {}
+                for t, message in chunk_errors.items():
+                    (missing if is_missing_data(message) else failed)[t.upper()] = message
+                if failed:
+                    breaker.failure()
+                    logger.warning("%s attempt %d failed for %s", endpoint, attempt + 1, ', '.join(failed))
+                else:
+                    breaker.success()
+                errors.update(failed)
+                if data is not None:
+                    frames.append(data)
+            pending = list(errors)
+            if not pending or circuit_open:
+                break
+            if attempt < self.max_retries:
+                time.sleep(self.backoff(attempt))
+
+        data = _merge_downloads(frames)
+        if len(missing) + len(errors) < len(tickers):
+            status = OK if not is_empty(data) else EMPTY
+        elif errors:
+            status = CIRCUIT_OPEN if circuit_open else FAILED
+        else:
+            status = EMPTY
+        result = Result(endpoint, status, data=data, error=DownloadError(errors) if errors else None,
+                        attempts=attempts, missing=missing, errors=errors)
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        if metrics.enabled:
+            metrics.record_call(f'upstream.{endpoint}', result.elapsed_ms, error=result.failed)
+        return result
+
+    def breaker(self, endpoint):
+
+        with self._lock:
+            if endpoint not in self.breakers:
+                self.breakers[endpoint] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return self.breakers[endpoint]
+
+    def backoff(self, attempt):
+
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def fetch(self, endpoint, fn, *args, **kwargs):
+
+        breaker = self.breaker(endpoint)
+        start = time.perf_counter()
+        attempts = 0
+        error = None
+        result = None
+
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow():
+                result = Result(endpoint, CIRCUIT_OPEN, error=error, attempts=attempts)
+                break
+            self.bucket.acquire()
+            attempts += 1
+            with self._slots:
+                try:
+                    data = fn(*args, **kwargs)
+                except NO_DATA_ERRORS as e:
+                    breaker.success()
+                    result = Result(endpoint, EMPTY, error=e, attempts=attempts)
+                except Exception as e:
+                    breaker.failure()
+                    error = e
+                    logger.warning("%s attempt %d failed: %s", endpoint, attempts, e)
+                else:
+                    breaker.success()
+                    result = Result(endpoint, EMPTY if is_empty(data) else OK, data=data, attempts=attempts)
+            if result is not None:
+                break
+            if attempt < self.max_retries:
+                time.sleep(self.backoff(attempt))
+
+        if result is None:
+            result = Result(endpoint, FAILED, error=error, attempts=attempts)
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        if metrics.enabled:
+            metrics.record_call(f'upstream.{endpoint}', result.elapsed_ms, error=result.failed)
+        return result
+
+    def get(self, endpoint, fn, *args, default=None, **kwargs):
+
+        return self.fetch(endpoint, fn, *args, **kwargs).unwrap(default=default)
+
+
+gateway = Gateway()
@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import plotly_express as px
 from yf_utils import TickerAnalysis, SectorAnalysis, Query, MarketAnalysis
+from yf_metrics import metrics
+from yf_batch import load_artifacts, report_prompt, ticker_bundle
+from yf_stream import INTRADAY_PERIODS, LiveTracker
+import time
 y = TickerAnalysis()
 s = SectorAnalysis()
 q = Query()
@@ -25,7 +29,7 @@ st.markdown(
 )
 
 pages = ['Home', 'Ticker Analysis', 'Sector & Industry Analysis',
-         'Market Analysis', 'Portfolio Analysis', 'Invest Divest', 'Search']
+         'Live Chart', 'Market Analysis', 'Portfolio Analysis', 'Invest Divest', 'Search', 'Diagnostics']
 
 side_bar = st.sidebar.selectbox(
     'Select a Page',
@@ -47,72 +51,53 @@ elif side_bar == 'Ticker Analysis':
     
     st.title('Ticker Analysis')
     tickers = st.text_input(label='Enter Tickers', placeholder='MSFT, AAPL, TSLA')
-    history_options = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
+    interval = st.selectbox(label='Choose Interval', options=['1d', '1m', '5m', '15m'])
+    history_options = INTRADAY_PERIODS.get(interval, ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max'])
     history = st.selectbox(label='Choose Timeframe', placeholder='1d', options=history_options)
 
     if st.button('Run Analysis'):
 
-        historical = y.ticker_history(symbol=tickers, timeframe=history)
-        info = y.ticker_info(symbol=tickers)
-        ticker_name = info.loc[info['attributes'] == 'longName', f'{tickers}'].values[0]
-        candlestick = y.candlestick(symbol=tickers, timeframe=history)
-        short_term = y.short_term_moving(symbol=tickers, timeframe=history)
-        long_term = y.long_term_moving(symbol=tickers, timeframe=history)
-        sustainability = y.ticker_sustainability(symbol=tickers)
-        ticker_analyst_price_targets = y.analyst_price_targets(symbol=tickers)
-        analyst_reccomendations = y.analyst_reccomendations(symbol=tickers)
-        updown = y.upgrades_downgrades(symbol=tickers)
-        ticker_news = y.ticker_news(symbol=tickers)
-        ticker_news_list = y.ticker_news_list(symbol=tickers)
-        volatility = y.volatility(symbol=tickers, timeframe=history)
-        volatility_plot = y.volatility_plot(symbol=tickers, timeframe=history)
-        insider_transactions = y.insider_transactions(symbol=tickers)
-        institutional_holders = y.insitutional_holders(symbol=tickers)
-        fund_top_holdings = y.fund_holdings(symbol=tickers)
-        sec_filings = y.sec_filings(symbol=tickers)
-        
-        response = y.llm(prompt=f'''
-
-        Given the following ticker {tickers}, 
-        and associated company {ticker_name},
-        the historical trends {historical},
-        core info: {info}, 
-        price_targets: {ticker_analyst_price_targets},
-        analyst_reccomendations: {analyst_reccomendations}, 
-        upgrades and downgrades: {updown},
-        latest_news: {ticker_news_list},
-        volatility_measurements: {volatility}, and
-        insider_transactions: {insider_transactions}
-
-        Please develop an incredibly detailed investment report detailing insights from all of the above, 
-        especially the news, and provide a reccomendation for buying, holding, and selling.
-                
-        ''')
-
-        st.plotly_chart(candlestick)
-        st.plotly_chart(volatility_plot)
-        st.plotly_chart(short_term)
-        st.plotly_chart(long_term)
+        # Prefer artifacts precomputed by yf_batch, fall back to live data
+        bundle = load_artifacts(symbol=tickers, timeframe=history) if interval == '1d' else None
+        metrics.record_cache('artifacts', bundle is not None)
+        if bundle is None:
+            bundle = ticker_bundle(y, tickers, history, interval=interval)
+
+        frames = bundle['frames']
+        figures = bundle['figures']
+        if bundle['built_at'] is not None:
+            st.caption(f"Showing precomputed data built {bundle['built_at']:%Y-%m-%d %H:%M} UTC")
+
+        if bundle['report'] is None:
+            response = y.llm(prompt=report_prompt(bundle))
+
+        st.plotly_chart(figures['candlestick'])
+        st.plotly_chart(figures['volatility'])
+        st.plotly_chart(figures['short_term'])
+        st.plotly_chart(figures['long_term'])
         st.write('Ticker Info')
-        st.dataframe(info)
+        st.dataframe(frames['info'])
         st.write('Analyst Price Targets')
-        st.dataframe(ticker_analyst_price_targets)
+        st.dataframe(bundle['analyst_price_targets'])
         st.write('Analyst Reccomendations')
-        st.dataframe(analyst_reccomendations)
+        st.dataframe(frames['analyst_recommendations'])
         st.write('Upgrades/Downgrades')
-        st.dataframe(updown)
+        st.dataframe(frames['upgrades_downgrades'])
         st.write('Latest News')
-        st.dataframe(ticker_news)
+        st.dataframe(frames['news'])
         st.write('Insider Transactions')
-        st.dataframe(insider_transactions)
+        st.dataframe(frames['insider_transactions'])
         st.write('Institutional Holders')
-        st.dataframe(institutional_holders)
+        st.dataframe(frames['institutional_holders'])
         st.write('Top Holdings')
-        st.dataframe(fund_top_holdings)
+        st.dataframe(frames['fund_holdings'])
         st.write('SEC Filings')
-        st.dataframe(sec_filings)
+        st.dataframe(frames['sec_filings'])
         st.sidebar.write('Investment Report (Generated by AI)')
-        st.sidebar.write_stream(response)
+        if bundle['report'] is None:
+            st.sidebar.write_stream(response)
+        else:
+            st.sidebar.write(bundle['report'])
 
 elif side_bar == 'Sector & Industry Analysis':
 
@@ -160,6 +145,39 @@ elif side_bar == 'Sector & Industry Analysis':
         st.write('Top Industry Performing Companies')
         st.dataframe(top_ip_companies)
         
+elif side_bar == 'Live Chart':
+
+    st.title('Live Chart')
+    watchlist = st.text_input(label='Enter Tickers', placeholder='MSFT, AAPL, TSLA')
+    live_interval = st.selectbox(label='Choose Interval', options=['1m', '5m', '15m'])
+    window = st.selectbox(label='Moving Average Window', options=[15, 200])
+    refresh = st.number_input(label='Refresh Every (seconds)', min_value=15, value=60)
+    live = st.toggle('Live')
+
+    symbols = [t.strip().upper() for t in watchlist.split(',') if t.strip()]
+    key = (tuple(symbols), live_interval, window)
+    if symbols and st.session_state.get('live_key') != key:
+        # New watchlist or settings, so start the indicator state from scratch
+        st.session_state['live_key'] = key
+        st.session_state['live_tracker'] = LiveTracker(symbols, interval=live_interval, window=window)
+
+    tracker = st.session_state.get('live_tracker')
+    if symbols and tracker is not None:
+        new_rows = tracker.poll()
+        if tracker.ignored:
+            st.write(f"No data for {', '.join(sorted(tracker.ignored))}, not tracking")
+        for symbol in tracker.symbols:
+            if symbol in tracker.ignored:
+                continue
+            st.plotly_chart(tracker.figure(symbol))
+            latest = new_rows[symbol][-1] if new_rows[symbol] else None
+            if latest is not None and (latest['Buy Signal'] or latest['Sell Signal']):
+                st.write(f"{symbol}: {'Buy' if latest['Buy Signal'] else 'Sell'} signal at {latest['Date']}")
+
+        if live:
+            time.sleep(refresh)
+            st.rerun()
+
 elif side_bar == 'Market Analysis':
 
     market_options = ['US', 'GB', 'ASIA', 'EUROPE', 'RATES', 'COMMODITIES', 'CURRENCIES', 'CRYPTOCURRENCIES']
@@ -234,3 +252,32 @@ elif side_bar == 'Search':
         st.write('Research Reports')
         st.dataframe(research)
 
+elif side_bar == 'Diagnostics':
+
+    st.title('Diagnostics')
+
+    enabled = st.toggle('Instrumentation Enabled', value=metrics.enabled)
+    if enabled != metrics.enabled:
+        metrics.set_enabled(enabled)
+
+    snapshot = metrics.snapshot()
+
+    st.write('Method Latency')
+    st.dataframe(metrics.to_frame())
+
+    st.write('LLM Generation')
+    llm = snapshot['llm']
+    col1, col2, col3 = st.columns(3)
+    col1.metric('Time to First Token (ms)', llm['ttft_mean_ms'])
+    col2.metric('Tokens / sec', llm['tokens_per_sec'])
+    col3.metric('Streams', llm['streams'])
+
+    st.write('Cache Hit Ratios')
+    st.dataframe(pd.DataFrame.from_dict(snapshot['cache'], orient='index'))
+
+    st.download_button('Download JSON', data=metrics.to_json(), file_name='paladin_metrics.json', mime='application/json')
+    st.download_button('Download Prometheus Text', data=metrics.to_prometheus(), file_name='paladin_metrics.prom', mime='text/plain')
+
+    if st.button('Reset Metrics'):
+        metrics.reset()
+        st.rerun()
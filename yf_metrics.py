@@ -0,0 +1,293 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+# Latency bucket upper bounds in milliseconds (last bucket is +Inf)
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float('inf'))
+
+
+def _env_enabled():
+    return os.getenv("PALADIN_METRICS", "1").lower() not in ("0", "false", "off", "no")
+
+
+def payload_rows(result):
+    """Best-effort row count for whatever a public method returned."""
+
+    if result is None:
+        return 0
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result)
+    if isinstance(result, (list, dict)):
+        return len(result)
+    if isinstance(result, tuple):
+        return sum(payload_rows(r) for r in result)
+    return 0
+
+
+class Histogram():
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+
+        # Upper bound of the bucket holding the q-th observation
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class MethodStats():
+
+    def __init__(self):
+
+        self.latency = Histogram()
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+
+    def to_dict(self):
+
+        count = self.latency.count
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'avg_rows': self.rows / self.calls if self.calls else 0.0,
+            'total_ms': round(self.latency.total, 3),
+            'mean_ms': round(self.latency.total / count, 3) if count else 0.0,
+            'p50_ms': round(self.latency.quantile(0.5), 3),
+            'p95_ms': round(self.latency.quantile(0.95), 3),
+            'max_ms': round(self.latency.max, 3),
+            'buckets': {str(b): n for b, n in zip(self.latency.buckets, self.latency.counts)},
+        }
+
+
+class Metrics():
+    """Process-wide registry for method latencies, cache counters and LLM stream stats."""
+
+    def __init__(self):
+
+        self.enabled = _env_enabled()
+        self._lock = threading.Lock()
+        self._classes = []
+        self.reset()
+
+    def reset(self):
+
+        with self._lock:
+            self.methods = {}
+            self.cache = {}
+            self.llm = {'streams': 0, 'tokens': 0, 'ttft': Histogram(), 'stream_ms': 0.0}
+
+    # --- recording -------------------------------------------------------
+
+    def record_call(self, name, elapsed_ms, rows=0, error=False):
+
+        with self._lock:
+            stats = self.methods.get(name)
+            if stats is None:
+                stats = self.methods[name] = MethodStats()
+            stats.calls += 1
+            stats.rows += rows
+            stats.errors += int(error)
+            stats.latency.observe(elapsed_ms)
+
+    def record_cache(self, name, hit):
+
+        if not self.enabled:
+            return
+        with self._lock:
+            counts = self.cache.setdefault(name, {'hits': 0, 'misses': 0})
+            counts['hits' if hit else 'misses'] += 1
+
+    def record_stream(self, ttft_ms, tokens, elapsed_ms):
+
+        with self._lock:
+            self.llm['streams'] += 1
+            self.llm['tokens'] += tokens
+            self.llm['stream_ms'] += elapsed_ms
+            if ttft_ms is not None:
+                self.llm['ttft'].observe(ttft_ms)
+
+    # --- instrumentation -------------------------------------------------
+
+    def _timed_stream(self, name, stream, start):
+
+        first = None
+        tokens = 0
+        error = False
+        try:
+            for chunk in stream:
+                if first is None:
+                    first = time.perf_counter()
+                tokens += 1  # Ollama streams roughly one token per chunk
+                yield chunk
+        except Exception:
+            error = True
+            raise
+        finally:
+            end = time.perf_counter()
+            ttft = (first - start) * 1000 if first is not None else None
+            self.record_call(name, (end - start) * 1000, rows=tokens, error=error)
+            self.record_stream(ttft, tokens, (end - (first or start)) * 1000)
+
+    def wrap(self, name, func):
+
+        metrics = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                metrics.record_call(name, (time.perf_counter() - start) * 1000, error=True)
+                raise
+            if inspect.isgenerator(result):
+                # Generators are lazy, so time the stream as it is consumed
+                return metrics._timed_stream(name, result, start)
+            metrics.record_call(name, (time.perf_counter() - start) * 1000, rows=payload_rows(result))
+            return result
+
+        wrapper.__wrapped_by_metrics__ = func
+        return wrapper
+
+    def instrument(self, cls):
+        """Wrap every public method on cls. No-op when metrics are disabled."""
+
+        if cls not in self._classes:
+            self._classes.append(cls)
+        if not self.enabled or '_uninstrumented' in cls.__dict__:
+            return cls
+        originals = {}
+        for attr, func in list(vars(cls).items()):
+            if attr.startswith('_') or not inspect.isfunction(func):
+                continue
+            originals[attr] = func
+            setattr(cls, attr, self.wrap(f'{cls.__name__}.{attr}', func))
+        cls._uninstrumented = originals
+        return cls
+
+    def uninstrument(self, cls):
+
+        originals = cls.__dict__.get('_uninstrumented')
+        if originals is None:
+            return cls
+        for attr, func in originals.items():
+            setattr(cls, attr, func)
+        del cls._uninstrumented
+        return cls
+
+    def set_enabled(self, enabled):
+        """Toggle at runtime; disabling restores the original methods so there is no overhead."""
+
+        self.enabled = enabled
+        for cls in self._classes:
+            if enabled:
+                self.instrument(cls)
+            else:
+                self.uninstrument(cls)
+
+    # --- export ----------------------------------------------------------
+
+    def snapshot(self):
+
+        with self._lock:
+            methods = {name: stats.to_dict() for name, stats in sorted(self.methods.items())}
+            cache = {}
+            for name, counts in sorted(self.cache.items()):
+                total = counts['hits'] + counts['misses']
+                cache[name] = dict(counts, ratio=counts['hits'] / total if total else 0.0)
+            ttft = self.llm['ttft']
+            stream_s = self.llm['stream_ms'] / 1000
+            llm = {
+                'streams': self.llm['streams'],
+                'tokens': self.llm['tokens'],
+                'ttft_mean_ms': round(ttft.total / ttft.count, 3) if ttft.count else 0.0,
+                'ttft_p95_ms': round(ttft.quantile(0.95), 3),
+                'tokens_per_sec': round(self.llm['tokens'] / stream_s, 3) if stream_s else 0.0,
+            }
+        return {'enabled': self.enabled, 'methods': methods, 'cache': cache, 'llm': llm}
+
+    def to_frame(self):
+
+        rows = []
+        for name, stats in self.snapshot()['methods'].items():
+            row = {'method': name}
+            row.update({k: v for k, v in stats.items() if k != 'buckets'})
+            rows.append(row)
+        df = pd.DataFrame(rows)
+        if not df.empty:
+            df = df.sort_values(by='total_ms', ascending=False)
+        return df
+
+    def to_json(self, indent=2):
+
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self):
+
+        lines = [
+            '# HELP paladin_method_latency_ms Public method latency in milliseconds.',
+            '# TYPE paladin_method_latency_ms histogram',
+        ]
+        with self._lock:
+            items = sorted(self.methods.items())
+            for name, stats in items:
+                cumulative = 0
+                for bound, n in zip(stats.latency.buckets, stats.latency.counts):
+                    cumulative += n
+                    le = '+Inf' if bound == float('inf') else str(bound)
+                    lines.append(f'paladin_method_latency_ms_bucket{{method="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'paladin_method_latency_ms_sum{{method="{name}"}} {stats.latency.total:.3f}')
+                lines.append(f'paladin_method_latency_ms_count{{method="{name}"}} {stats.latency.count}')
+            lines.append('# TYPE paladin_method_errors_total counter')
+            for name, stats in items:
+                lines.append(f'paladin_method_errors_total{{method="{name}"}} {stats.errors}')
+            lines.append('# TYPE paladin_method_rows_total counter')
+            for name, stats in items:
+                lines.append(f'paladin_method_rows_total{{method="{name}"}} {stats.rows}')
+            lines.append('# TYPE paladin_cache_requests_total counter')
+            for name, counts in sorted(self.cache.items()):
+                lines.append(f'paladin_cache_requests_total{{cache="{name}",result="hit"}} {counts["hits"]}')
+                lines.append(f'paladin_cache_requests_total{{cache="{name}",result="miss"}} {counts["misses"]}')
+        llm = self.snapshot()['llm']
+        lines.append('# TYPE paladin_llm_tokens_total counter')
+        lines.append(f'paladin_llm_tokens_total {llm["tokens"]}')
+        lines.append('# TYPE paladin_llm_ttft_ms gauge')
+        lines.append(f'paladin_llm_ttft_ms {llm["ttft_mean_ms"]}')
+        lines.append('# TYPE paladin_llm_tokens_per_sec gauge')
+        lines.append(f'paladin_llm_tokens_per_sec {llm["tokens_per_sec"]}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
@@ -0,0 +1,346 @@
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Position kinds. The meaning of a position's weight depends on its kind, so weight-based
+# queries always work on a single kind:
+#   institutional - fraction of the symbol's shares held by the institution (pctHeld)
+#   fund          - fraction of the fund's assets in the symbol (Holding Percent)
+#   insider       - shares moved by the insider's reported transactions
+INSTITUTIONAL = 0
+FUND = 1
+INSIDER = 2
+KINDS = ['institutional', 'fund', 'insider']
+
+
+class _Names():
+    """Interns strings to dense integer ids."""
+
+    def __init__(self, names=()):
+
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def id(self, name):
+
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def get(self, name):
+        return self.ids.get(name)
+
+    def __len__(self):
+        return len(self.names)
+
+
+class OwnershipIndex():
+    """
+    Holder <-> symbol positions from institutional holders, fund holdings and insider transactions.
+
+    Positions live in flat parallel arrays; holder->positions and symbol->holders lookups use
+    CSR offsets built with one argsort and rebuilt lazily after new data is added.
+    """
+
+    def __init__(self):
+
+        self.holders = _Names()
+        self.symbols = _Names()
+        self.holder_ids = np.empty(0, dtype=np.int32)
+        self.symbol_ids = np.empty(0, dtype=np.int32)
+        self.kinds = np.empty(0, dtype=np.int8)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.sources = {}  # (kind, source symbol) -> position row ids it contributed
+        self._pending = []
+        self._csr = None
+
+    # --- ingest ----------------------------------------------------------
+
+    def _replace(self, kind, source, holders, symbols, weights):
+
+        # Re-ingesting a source drops whatever it contributed last time
+        self._flush()
+        stale = self.sources.pop((kind, source), None)
+        if stale is not None and len(stale):
+            keep = np.ones(len(self.holder_ids), dtype=bool)
+            keep[stale] = False
+            self._compact(keep)
+
+        h = np.fromiter((self.holders.id(str(x)) for x in holders), dtype=np.int32, count=len(holders))
+        s = np.fromiter((self.symbols.id(str(x).upper()) for x in symbols), dtype=np.int32, count=len(symbols))
+        w = np.nan_to_num(np.asarray(weights, dtype=np.float64))
+        start = len(self.holder_ids) + sum(len(p[0]) for p in self._pending)
+        self._pending.append((h, s, np.full(len(h), kind, dtype=np.int8), w))
+        self.sources[(kind, source)] = np.arange(start, start + len(h), dtype=np.int64)
+        self._csr = None
+
+    def _flush(self):
+
+        if not self._pending:
+            return
+        h, s, k, w = zip(*self._pending)
+        self.holder_ids = np.concatenate((self.holder_ids,) + h)
+        self.symbol_ids = np.concatenate((self.symbol_ids,) + s)
+        self.kinds = np.concatenate((self.kinds,) + k)
+        self.weights = np.concatenate((self.weights,) + w)
+        self._pending = []
+
+    def _compact(self, keep):
+
+        remap = np.cumsum(keep) - 1
+        self.holder_ids = self.holder_ids[keep]
+        self.symbol_ids = self.symbol_ids[keep]
+        self.kinds = self.kinds[keep]
+        self.weights = self.weights[keep]
+        for key, rows in self.sources.items():
+            self.sources[key] = remap[rows]
+
+    def add_institutional_holders(self, symbol, df):
+
+        if df is None or df.empty or 'Holder' not in df.columns:
+            return self
+        # Without pctHeld the weight is unknown; share counts would not be comparable across holders
+        weights = df['pctHeld'] if 'pctHeld' in df.columns else pd.Series(0.0, index=df.index)
+        self._replace(INSTITUTIONAL, symbol.upper(), df['Holder'].tolist(), [symbol] * len(df), weights)
+        return self
+
+    def add_fund_holdings(self, fund_symbol, df):
+
+        if df is None or df.empty or 'Symbol' not in df.columns:
+            return self
+        df = df.dropna(subset=['Symbol'])
+        weights = df['Holding Percent'] if 'Holding Percent' in df.columns else pd.Series(0.0, index=df.index)
+        self._replace(FUND, fund_symbol.upper(), [fund_symbol.upper()] * len(df), df['Symbol'].tolist(), weights)
+        return self
+
+    def add_insider_transactions(self, symbol, df):
+
+        if df is None or df.empty or 'Insider' not in df.columns:
+            return self
+        shares = df.groupby('Insider')['Shares'].sum() if 'Shares' in df.columns else df.groupby('Insider').size()
+        self._replace(INSIDER, symbol.upper(), shares.index.tolist(), [symbol] * len(shares), shares.values)
+        return self
+
+    def add_ticker(self, y, symbol):
+        """Fetch and index one symbol's holders through a TickerAnalysis instance."""
+
+        self.add_institutional_holders(symbol, y.insitutional_holders(symbol=symbol))
+        self.add_fund_holdings(symbol, y.fund_holdings(symbol=symbol))
+        self.add_insider_transactions(symbol, y.insider_transactions(symbol=symbol))
+        return self
+
+    def add_bundle(self, bundle):
+
+        frames = bundle['frames']
+        symbol = bundle['symbol']
+        self.add_institutional_holders(symbol, frames.get('institutional_holders'))
+        self.add_fund_holdings(symbol, frames.get('fund_holdings'))
+        self.add_insider_transactions(symbol, frames.get('insider_transactions'))
+        return self
+
+    @classmethod
+    def from_artifacts(cls, root, timeframe='1y'):
+        """Build an index from holder frames written by yf_batch."""
+
+        index = cls()
+        for path in sorted(glob.glob(os.path.join(root, timeframe, '*', '_SUCCESS'))):
+            folder = os.path.dirname(path)
+            symbol = os.path.basename(folder)
+            if re.search(r'\.(tmp|old)-\d+$', symbol):
+                # yf_batch.write_artifacts staging directories, left behind by a crashed run
+                continue
+
+            def read(name):
+                file = os.path.join(folder, f'{name}.parquet')
+                return pd.read_parquet(file) if os.path.exists(file) else None
+
+            index.add_institutional_holders(symbol, read('institutional_holders'))
+            index.add_fund_holdings(symbol, read('fund_holdings'))
+            index.add_insider_transactions(symbol, read('insider_transactions'))
+        return index
+
+    # --- lookups ---------------------------------------------------------
+
+    def _index(self):
+
+        self._flush()
+        if self._csr is None:
+            by_holder = np.argsort(self.holder_ids, kind='stable')
+            by_symbol = np.argsort(self.symbol_ids, kind='stable')
+            holder_offsets = np.zeros(len(self.holders) + 1, dtype=np.int64)
+            symbol_offsets = np.zeros(len(self.symbols) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.holder_ids, minlength=len(self.holders)), out=holder_offsets[1:])
+            np.cumsum(np.bincount(self.symbol_ids, minlength=len(self.symbols)), out=symbol_offsets[1:])
+            self._csr = (by_holder, holder_offsets, by_symbol, symbol_offsets)
+        return self._csr
+
+    def _require_kind(self, kind):
+
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {KINDS}; weights of different kinds are not comparable")
+        return kind
+
+    def _rows(self, rows, kind):
+
+        if kind is not None:
+            rows = rows[self.kinds[rows] == KINDS.index(kind)]
+        return rows
+
+    def _symbol_rows(self, symbol, kind=None):
+
+        i = self.symbols.get(symbol.upper())
+        if i is None:
+            return np.empty(0, dtype=np.int64)
+        _, _, by_symbol, offsets = self._index()
+        return self._rows(by_symbol[offsets[i]:offsets[i + 1]], kind)
+
+    def _holder_rows(self, holder, kind=None):
+
+        i = self.holders.get(holder)
+        if i is None:
+            return np.empty(0, dtype=np.int64)
+        by_holder, offsets, _, _ = self._index()
+        return self._rows(by_holder[offsets[i]:offsets[i + 1]], kind)
+
+    def _frame(self, rows):
+
+        holder_names = np.asarray(self.holders.names, dtype=object)
+        symbol_names = np.asarray(self.symbols.names, dtype=object)
+        return pd.DataFrame({
+            'Holder': holder_names[self.holder_ids[rows]],
+            'Symbol': symbol_names[self.symbol_ids[rows]],
+            'Kind': np.asarray(KINDS, dtype=object)[self.kinds[rows]],
+            'Weight': self.weights[rows],
+        })
+
+    def holders_of(self, symbol, kind=None):
+
+        return self._frame(self._symbol_rows(symbol, kind)).sort_values(by=['Kind', 'Weight'], ascending=[True, False])
+
+    def positions_of(self, holder, kind=None):
+
+        return self._frame(self._holder_rows(holder, kind)).sort_values(by=['Kind', 'Weight'], ascending=[True, False])
+
+    def common_holders(self, symbols, kind):
+        """Holders of the given kind with a position in every one of the given symbols."""
+
+        self._require_kind(kind)
+        rows = [self._symbol_rows(s, kind) for s in symbols]
+        common = None
+        for r in rows:
+            ids = np.unique(self.holder_ids[r])
+            common = ids if common is None else np.intersect1d(common, ids, assume_unique=True)
+        if common is None or len(common) == 0:
+            return pd.DataFrame(columns=['Holder'] + [s.upper() for s in symbols])
+
+        df = pd.DataFrame({'Holder': np.asarray(self.holders.names, dtype=object)[common]})
+        for s, r in zip(symbols, rows):
+            weights = np.zeros(len(self.holders))
+            np.add.at(weights, self.holder_ids[r], self.weights[r])
+            df[s.upper()] = weights[common]
+        return df
+
+    def top_common_holders(self, symbols, kind=None, top=20):
+        """Holders ranked by how many of the given symbols they hold; scales to thousands of symbols."""
+
+        rows = np.concatenate([self._symbol_rows(s, kind) for s in symbols]) if symbols else np.empty(0, dtype=np.int64)
+        # Count each (holder, symbol) pair once even if it was reported several times
+        pairs = np.unique(self.holder_ids[rows].astype(np.int64) * len(self.symbols) + self.symbol_ids[rows])
+        counts = np.bincount(pairs // len(self.symbols), minlength=len(self.holders)) if len(pairs) else np.zeros(0, dtype=np.int64)
+        order = np.argsort(-counts, kind='stable')[:top]
+        order = order[counts[order] > 0]
+        return pd.DataFrame({
+            'Holder': np.asarray(self.holders.names, dtype=object)[order],
+            'Symbols Held': counts[order],
+            'Share of Symbols': counts[order] / max(len(symbols), 1),
+        })
+
+    def overlap(self, holder_a, holder_b, kind='fund'):
+        """Positions held by both holders, e.g. two ETFs' common constituents."""
+
+        self._require_kind(kind)
+        weights = []
+        held = []
+        for holder in (holder_a, holder_b):
+            rows = self._holder_rows(holder, kind)
+            w = np.zeros(len(self.symbols))
+            np.add.at(w, self.symbol_ids[rows], self.weights[rows])
+            weights.append(w)
+            held.append(np.bincount(self.symbol_ids[rows], minlength=len(self.symbols)) > 0)
+        a, b = weights
+        common = np.flatnonzero(held[0] & held[1])
+        df = pd.DataFrame({
+            'Symbol': np.asarray(self.symbols.names, dtype=object)[common],
+            holder_a: a[common],
+            holder_b: b[common],
+        })
+        df['Overlap'] = np.minimum(a[common], b[common])
+        return df.sort_values(by='Overlap', ascending=False)
+
+    def overlap_score(self, holder_a, holder_b, kind='fund'):
+
+        return float(self.overlap(holder_a, holder_b, kind)['Overlap'].sum())
+
+    def concentration(self, kind, symbol=None, holder=None, top=10):
+        """Herfindahl index and top-N share of a symbol's holders or of a holder's positions, for one kind."""
+
+        self._require_kind(kind)
+        if symbol is None and holder is None:
+            raise ValueError("concentration needs a symbol or a holder")
+        rows = self._symbol_rows(symbol, kind) if symbol is not None else self._holder_rows(holder, kind)
+        w = np.abs(self.weights[rows])
+        total = w.sum()
+        if total == 0:
+            return {'positions': int(len(w)), 'hhi': 0.0, f'top_{top}_share': 0.0}
+        shares = w / total
+        return {
+            'positions': int(len(w)),
+            'hhi': float(np.sum(shares ** 2)),
+            f'top_{top}_share': float(np.sort(shares)[::-1][:top].sum()),
+        }
+
+    # --- persistence -----------------------------------------------------
+
+    def save(self, path):
+
+        self._flush()
+        keys = list(self.sources)
+        np.savez_compressed(
+            path,
+            holders=np.asarray(self.holders.names, dtype=str),
+            symbols=np.asarray(self.symbols.names, dtype=str),
+            holder_ids=self.holder_ids,
+            symbol_ids=self.symbol_ids,
+            kinds=self.kinds,
+            weights=self.weights,
+            source_kinds=np.asarray([k for k, _ in keys], dtype=np.int8),
+            source_names=np.asarray([s for _, s in keys], dtype=str),
+            source_lengths=np.asarray([len(self.sources[k]) for k in keys], dtype=np.int64),
+            source_rows=np.concatenate([self.sources[k] for k in keys]) if keys else np.empty(0, dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path):
+
+        index = cls()
+        with np.load(path, allow_pickle=False) as data:
+            index.holders = _Names(data['holders'].tolist())
+            index.symbols = _Names(data['symbols'].tolist())
+            index.holder_ids = data['holder_ids']
+            index.symbol_ids = data['symbol_ids']
+            index.kinds = data['kinds']
+            index.weights = data['weights']
+            rows = np.split(data['source_rows'], np.cumsum(data['source_lengths'])[:-1]) if len(data['source_lengths']) else []
+            for kind, name, r in zip(data['source_kinds'].tolist(), data['source_names'].tolist(), rows):
+                index.sources[(kind, name)] = r
+        return index
+
+    def __len__(self):
+
+        self._flush()
+        return len(self.holder_ids)
@@ -0,0 +1,218 @@
+import math
+from collections import deque
+
+import pandas as pd
+import plotly_express as px
+
+from yf_gateway import gateway
+
+# yfinance only serves intraday bars for recent periods
+INTRADAY_PERIODS = {
+    '1m': ['1d', '5d'],
+    '5m': ['1d', '5d', '1mo'],
+    '15m': ['1d', '5d', '1mo'],
+}
+# Regular-session bars per trading day, and the trading days each yfinance period covers
+BARS_PER_DAY = {'1m': 390, '5m': 78, '15m': 26, '1d': 1}
+PERIOD_DAYS = [('1d', 1), ('5d', 5), ('1mo', 21), ('3mo', 63), ('6mo', 126), ('1y', 252), ('2y', 504)]
+
+
+def warmup_period(interval, window):
+    """Shortest period with at least window bars, plus a day for the bar still forming."""
+
+    days = math.ceil(window / BARS_PER_DAY.get(interval, 1)) + 1
+    for period, n in PERIOD_DAYS:
+        if n >= days:
+            return period
+    return 'max'
+
+
+class SMA():
+
+    def __init__(self, window):
+
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+
+    def update(self, x):
+
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        return self.value
+
+    @property
+    def value(self):
+        return self.total / self.window if len(self.values) == self.window else math.nan
+
+
+class EWMA():
+    """Matches pandas ewm(span=span, adjust=False).mean()."""
+
+    def __init__(self, span):
+
+        self.alpha = 2 / (span + 1)
+        self.value = math.nan
+
+    def update(self, x):
+
+        self.value = x if math.isnan(self.value) else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class RollingStd():
+    """Sliding-window sample standard deviation (ddof=1) using Welford's update."""
+
+    def __init__(self, window):
+
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x):
+
+        if math.isnan(x):
+            return self.value
+        if len(self.values) < self.window:
+            self.values.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.values[0]
+            self.values.append(x)
+            old_mean = self.mean
+            self.mean += (x - old) / self.window
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        return self.value
+
+    @property
+    def value(self):
+        if len(self.values) < self.window or self.window < 2:
+            return math.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+
+class Crossover():
+    """Same rule as long_term_moving / short_term_moving: price crossing its moving average."""
+
+    def __init__(self):
+
+        self.prev_close = math.nan
+
+    def update(self, close, average):
+
+        buy = sell = False
+        if not math.isnan(self.prev_close) and not math.isnan(average):
+            buy = close > average and self.prev_close <= average
+            sell = close < average and self.prev_close >= average
+        self.prev_close = close
+        return buy, sell
+
+
+class MovingAverageState():
+    """Incremental equivalent of the Rolling / EWMA / signal columns for one symbol."""
+
+    def __init__(self, window, volatility_window=30, max_rows=2000):
+
+        self.window = window
+        self.sma = SMA(window)
+        self.ewma = EWMA(window)
+        self.crossover = Crossover()
+        self.volatility = RollingStd(volatility_window)
+        self.prev_close = math.nan
+        self.last_date = None
+        self.rows = deque(maxlen=max_rows)
+
+    def update(self, date, close):
+
+        rolling = self.sma.update(close)
+        ewma = self.ewma.update(close)
+        buy, sell = self.crossover.update(close, ewma)
+        ret = close / self.prev_close - 1 if not math.isnan(self.prev_close) else math.nan
+        self.prev_close = close
+        self.last_date = date
+        row = {
+            'Date': date,
+            'Close': close,
+            'Rolling': rolling,
+            'EWMA': ewma,
+            'Buy Signal': buy,
+            'Sell Signal': sell,
+            'Volatility': self.volatility.update(ret),
+        }
+        self.rows.append(row)
+        return row
+
+    def frame(self):
+        return pd.DataFrame(list(self.rows))
+
+
+class LiveTracker():
+    """
+    Polls intraday bars for a watchlist and feeds only the new ones into per-symbol indicator state.
+
+    One batched download per poll covers the whole watchlist. The newest bar is still forming,
+    so it is held back until a later bar arrives.
+    """
+
+    def __init__(self, symbols, interval='1m', window=15):
+
+        self.symbols = [s.strip().upper() for s in symbols if s.strip()]
+        self.interval = interval
+        self.window = window
+        self.states = {s: MovingAverageState(window) for s in self.symbols}
+        self.ignored = set()  # symbols that returned no data during warmup
+
+    def _download(self, symbols, start=None):
+
+        window = {'period': warmup_period(self.interval, self.window)} if start is None else {'start': start}
+        return gateway.download(tickers=symbols, interval=self.interval, group_by='ticker', progress=False, **window)
+
+    def poll(self):
+
+        # Symbols that share a last bar share a download, so a new or failing symbol
+        # never forces the rest of the watchlist back to a full warmup
+        groups = {}
+        for symbol, state in self.states.items():
+            if symbol not in self.ignored:
+                groups.setdefault(state.last_date, []).append(symbol)
+
+        new_rows = {symbol: [] for symbol in self.states}
+        for start, symbols in groups.items():
+            result = self._download(symbols, start)
+            if start is None:
+                # No data is final; rate-limited or network-failed symbols stay in warmup for the next poll
+                self.ignored.update(s for s in symbols if s in result.missing)
+            symbols = [s for s in symbols if s not in result.missing and s not in result.errors]
+            if not symbols or not result.ok:
+                continue
+
+            data = result.data
+            for symbol in symbols:
+                state = self.states[symbol]
+                if symbol not in data.columns.get_level_values(0):
+                    close = pd.Series(dtype=float)
+                else:
+                    close = data[symbol]['Close'].dropna().sort_index().iloc[:-1]
+                if start is None and close.empty:
+                    self.ignored.add(symbol)
+                    continue
+                if state.last_date is not None:
+                    close = close[close.index > state.last_date]
+                new_rows[symbol] = [state.update(date, float(value)) for date, value in close.items()]
+        return new_rows
+
+    def figure(self, symbol):
+
+        hist = self.states[symbol].frame()
+        fig = px.line(hist, x='Date', y=['Close', 'Rolling', 'EWMA'], title=f"{symbol} Live ({self.interval}, {self.window}-bar)")
+        if not hist.empty:
+            buy_points = hist.loc[hist['Buy Signal'], ['Date', 'Close']]
+            sell_points = hist.loc[hist['Sell Signal'], ['Date', 'Close']]
+            fig.add_scatter(x=buy_points['Date'], y=buy_points['Close'], mode='markers', marker=dict(color='green', size=10), name='Buy Signal')
+            fig.add_scatter(x=sell_points['Date'], y=sell_points['Close'], mode='markers', marker=dict(color='red', size=10), name='Sell Signal')
+        return fig
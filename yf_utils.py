@@ -5,8 +5,13 @@ import plotly.graph_objects as go
 import ollama
 from ollama import chat
 import os
-import yfinance as yf
 import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from yf_metrics import metrics
+from yf_gateway import gateway
+
+logger = logging.getLogger(__name__)
 
 class TickerAnalysis():
 
@@ -45,10 +50,10 @@ class TickerAnalysis():
         as_tickers = ['000001.SS', '^N225', '^HSI', '^AXJO', '^ADOW', 'JPY=X']
         rates = ['^IRX', '^FVX', '^TNX', '^TYX', '2YY=F', 'ZN=F']
 
-        us_markets = yf.download(tickers=us_tickers, period='6mo')
-        eu_markets = yf.download(tickers=eu_tickers, period='6mo')
-        as_markets = yf.download(tickers=as_tickers, period='6mo')
-        rates = yf.download(tickers=rates, period='6mo')
+        us_markets = gateway.download(tickers=us_tickers, period='6mo').unwrap()
+        eu_markets = gateway.download(tickers=eu_tickers, period='6mo').unwrap()
+        as_markets = gateway.download(tickers=as_tickers, period='6mo').unwrap()
+        rates = gateway.download(tickers=rates, period='6mo').unwrap()
 
         us_markets = us_markets.reset_index()
         us_markets.columns = ['_'.join(col).strip() if isinstance(col, tuple) else col for col in us_markets.columns]
@@ -69,31 +74,38 @@ class TickerAnalysis():
 
         return fig_1, fig_2, fig_3, fig_4
     
-    def ticker_history(self, symbol=None, timeframe='1y'):
-
-        data = yf.Ticker(symbol)
-        history = data.history(period=timeframe).reset_index()
+    def ticker_history(self, symbol=None, timeframe='1y', interval='1d', start=None):
+
+        data = gateway.ticker(symbol)
+        window = {'period': timeframe} if start is None else {'start': start}
+        # history() returns an empty frame on upstream errors unless asked to raise
+        result = gateway.fetch('Ticker.history', data.history, interval=interval, raise_errors=True, **window)
+        if not result.ok:
+            result.raise_for_status()
+            return pd.DataFrame(columns=['Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
+        history = result.data.reset_index()
+        history = history.rename(columns={'Datetime': 'Date'})  # intraday bars are indexed by Datetime
         history['Date'] = pd.to_datetime(history['Date'])
         history = history.sort_values(by='Date', ascending=False)
         return history
     
     def ticker_info(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        data = pd.json_normalize(data.info)
+        data = gateway.ticker(symbol)
+        data = pd.json_normalize(gateway.get('Ticker.info', lambda: data.info, default={}))
         transposed_data = data.transpose().reset_index()
         transposed_data.columns = ["attributes", f"{symbol}"]  # Rename columns
         return transposed_data
     
     def ticker_sustainability(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        esg_data = data.sustainability
+        data = gateway.ticker(symbol)
+        esg_data = gateway.get('Ticker.sustainability', lambda: data.sustainability)
         return esg_data
     
-    def candlestick(self, symbol=None, timeframe=None):
+    def candlestick(self, symbol=None, timeframe=None, history=None):
 
-        df = self.ticker_history(symbol=symbol, timeframe=timeframe)
+        df = self.ticker_history(symbol=symbol, timeframe=timeframe) if history is None else history
 
         fig = go.Figure(data=[go.Candlestick(x=df['Date'],
                 open=df['Open'],
@@ -110,9 +122,9 @@ class TickerAnalysis():
 
         return fig
         
-    def long_term_moving(self, symbol=None, timeframe=None):
+    def long_term_moving(self, symbol=None, timeframe=None, history=None):
 
-        hist = self.ticker_history(symbol=symbol, timeframe=timeframe)
+        hist = self.ticker_history(symbol=symbol, timeframe=timeframe) if history is None else history.copy()
 
         # Compute Moving Averages
         hist['Rolling'] = hist['Close'].rolling(window=200).mean()
@@ -133,9 +145,9 @@ class TickerAnalysis():
 
         return fig
 
-    def short_term_moving(self, symbol=None, timeframe=None):
+    def short_term_moving(self, symbol=None, timeframe=None, history=None):
 
-        hist = self.ticker_history(symbol=symbol, timeframe=timeframe)
+        hist = self.ticker_history(symbol=symbol, timeframe=timeframe) if history is None else history.copy()
 
         # Compute Short-Term Moving Averages
         hist['Rolling'] = hist['Close'].rolling(window=15).mean()
@@ -158,37 +170,37 @@ class TickerAnalysis():
 
     def analyst_price_targets(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        price_targets = data.analyst_price_targets
+        data = gateway.ticker(symbol)
+        price_targets = gateway.get('Ticker.analyst_price_targets', lambda: data.analyst_price_targets)
         return price_targets
 
     def analyst_reccomendations(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        reccomendations = data.recommendations
+        data = gateway.ticker(symbol)
+        reccomendations = gateway.get('Ticker.recommendations', lambda: data.recommendations)
         return reccomendations
 
     def upgrades_downgrades(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        updown = getattr(data, "upgrades_downgrades", None)
+        data = gateway.ticker(symbol)
+        updown = gateway.get('Ticker.upgrades_downgrades', lambda: getattr(data, "upgrades_downgrades", None))
         if updown is None or updown.empty:
-            print(f"No upgrade/downgrade data available for {symbol}")
+            logger.info("No upgrade/downgrade data available for %s", symbol)
             return pd.DataFrame()  # Return an empty DataFrame
         updown = updown.reset_index()
         if "GradeDate" in updown.columns:
             updown["GradeDate"] = pd.to_datetime(updown["GradeDate"])
             updown = updown.sort_values(by="GradeDate", ascending=False)
         else:
-            print(f"'GradeDate' column missing for {symbol}. Returning raw data.")
+            logger.info("'GradeDate' column missing for %s. Returning raw data.", symbol)
         return updown
 
     def ticker_news(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        news_data = getattr(data, "news", None)
+        data = gateway.ticker(symbol)
+        news_data = gateway.get('Ticker.news', lambda: getattr(data, "news", None))
         if not news_data:
-            print(f"No news data available for {symbol}")
+            logger.info("No news data available for %s", symbol)
             return pd.DataFrame()  # Return an empty DataFrame
         news = pd.json_normalize(news_data)
         if "content.pubDate" in news.columns:
@@ -197,7 +209,7 @@ class TickerAnalysis():
             news = news[['content.provider.displayName', 'content.title', 'content.contentType', 'content.summary', 'content.pubDate', 'content.canonicalUrl.url']]
             news.columns = ['Publisher', 'Title', 'Type', 'Summary', 'Publication Date', 'URL']
         else:
-            print(f"'content.pubDate' column missing for {symbol}. Returning raw news data.")
+            logger.info("'content.pubDate' column missing for %s. Returning raw news data.", symbol)
         return news
 
     def ticker_news_list(self, symbol=None):
@@ -207,91 +219,93 @@ class TickerAnalysis():
         if not data.empty and "Summary" in data.columns:
             content_list = data["Summary"].tolist()
         else:
-            print(f"No valid news summaries found for {symbol}")
+            logger.info("No valid news summaries found for %s", symbol)
         return content_list
 
-    def volatility(self, symbol=None, timeframe=None):
+    def volatility(self, symbol=None, timeframe=None, history=None):
 
-        history = self.ticker_history(symbol=symbol, timeframe=timeframe)
+        history = self.ticker_history(symbol=symbol, timeframe=timeframe) if history is None else history.copy()
         history['Daily Return'] = history['Close'].pct_change()
         history['Volatility'] = history['Daily Return'].rolling(window=30).std()
 
         return history
 
-    def volatility_plot(self, symbol=None, timeframe=None):
+    def volatility_plot(self, symbol=None, timeframe=None, history=None):
         
-        data = self.volatility(symbol=symbol, timeframe=timeframe)
+        data = self.volatility(symbol=symbol, timeframe=timeframe, history=history)
         fig = px.line(data, x = 'Date', y = 'Volatility', title=f'{symbol} Volatility Over Time')
 
         return fig
         
     def insider_transactions(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        transactions = data.insider_transactions
+        data = gateway.ticker(symbol)
+        transactions = gateway.get('Ticker.insider_transactions', lambda: data.insider_transactions)
 
         return transactions
 
     def insitutional_holders(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        institutional_holders = data.institutional_holders
+        data = gateway.ticker(symbol)
+        institutional_holders = gateway.get('Ticker.institutional_holders', lambda: data.institutional_holders)
 
         return institutional_holders
 
     def cash_flow(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        cf = data.cash_flow
+        data = gateway.ticker(symbol)
+        cf = gateway.get('Ticker.cash_flow', lambda: data.cash_flow)
         return cf
 
     def balance_sheet(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        bs = data.balance_sheet
+        data = gateway.ticker(symbol)
+        bs = gateway.get('Ticker.balance_sheet', lambda: data.balance_sheet)
         return bs
 
     def income_statements(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        incs = data.income_stmt
+        data = gateway.ticker(symbol)
+        incs = gateway.get('Ticker.income_stmt', lambda: data.income_stmt)
 
         return incs
 
     def top_holdings(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        top_holders = data.funds_data.top_holdings.reset_index()
+        data = gateway.ticker(symbol)
+        result = gateway.fetch('Ticker.top_holdings', lambda: getattr(data.funds_data, 'top_holdings', None))
+        if not result.ok:
+            result.raise_for_status()
+            return pd.DataFrame()
+        top_holders = result.data.reset_index()
         return top_holders
 
     def fund_holdings(self, symbol=None):
 
-        try:
-            dat = yf.Ticker(symbol)
-            if hasattr(dat, 'funds_data') and hasattr(dat.funds_data, 'top_holdings'):
-                fund_holdings = dat.funds_data.top_holdings
-                if fund_holdings is not None and not fund_holdings.empty:
-                    return fund_holdings.reset_index()
-                else:
-                    print(f"⚠️ No fund holdings data found for {symbol}.")
-                    return None
-            else:
-                print(f"⚠️ No fund holdings attribute found for {symbol}.")
-                return None
-        except Exception as e:
-            print(f"🚨 Error fetching fund holdings for {symbol}: {e}")
-            return None
+        dat = gateway.ticker(symbol)
+        result = gateway.fetch('Ticker.top_holdings', lambda: getattr(dat.funds_data, 'top_holdings', None))
+        if result.ok:
+            return result.data.reset_index()
+        if result.empty:
+            logger.info("No fund holdings data found for %s", symbol)
+        else:
+            logger.warning("Error fetching fund holdings for %s: %s", symbol, result.error)
+        return None
     
     def earnings_estimate(self, symbol=None):
 
-        data = yf.Ticker(symbol)
-        earnings = data.earnings_estimate.reset_index()
+        data = gateway.ticker(symbol)
+        result = gateway.fetch('Ticker.earnings_estimate', lambda: data.earnings_estimate)
+        if not result.ok:
+            result.raise_for_status()
+            return pd.DataFrame()
+        earnings = result.data.reset_index()
         return earnings
 
     def sec_filings(self, symbol=None):
 
-        dat = yf.Ticker(symbol)
-        filings = dat.sec_filings
+        dat = gateway.ticker(symbol)
+        filings = gateway.get('Ticker.sec_filings', lambda: dat.sec_filings, default=[])
         filings_df = pd.json_normalize(filings)
         return filings_df
 
@@ -382,8 +396,8 @@ class SectorAnalysis():
 
     def sector_overview(self, sector_name=None):
 
-        sector = yf.Sector(key=sector_name)
-        overview = sector.overview
+        sector = gateway.sector(sector_name)
+        overview = gateway.get('Sector.overview', lambda: sector.overview, default={})
         data = pd.json_normalize(overview)
         transposed_data = data.transpose().reset_index()
         transposed_data.columns = ["attributes", f"{sector_name}"]  # Rename columns
@@ -392,32 +406,32 @@ class SectorAnalysis():
     
     def top_sector_companies(self, sector_name=None):
 
-        sector = yf.Sector(key=sector_name)
-        top_companies = sector.top_companies
+        sector = gateway.sector(sector_name)
+        top_companies = gateway.get('Sector.top_companies', lambda: sector.top_companies)
         return top_companies
 
     def top_sector_etfs(self, sector_name=None):
 
-        sector = yf.Sector(key=sector_name)
-        top_companies = sector.top_etfs
+        sector = gateway.sector(sector_name)
+        top_companies = gateway.get('Sector.top_etfs', lambda: sector.top_etfs)
         return top_companies
 
     def top_sector_mutual_funds(self, sector_name=None):
 
-        sector = yf.Sector(key=sector_name)
-        top_companies = sector.top_mutual_funds
+        sector = gateway.sector(sector_name)
+        top_companies = gateway.get('Sector.top_mutual_funds', lambda: sector.top_mutual_funds)
         return top_companies
     
     def sector_research_reports(self, sector_name=None):
 
-        sector = yf.Sector(key=sector_name)
-        srr = sector.research_reports
+        sector = gateway.sector(sector_name)
+        srr = gateway.get('Sector.research_reports', lambda: sector.research_reports)
         return srr
     
     def industry_overview(self, industry_name=None):
 
-        indsutry = yf.Industry(key=industry_name)
-        tc = indsutry.overview
+        indsutry = gateway.industry(industry_name)
+        tc = gateway.get('Industry.overview', lambda: indsutry.overview, default={})
         data = pd.json_normalize(tc)
         transposed_data = data.transpose().reset_index()
         transposed_data.columns = ["attributes", f"{industry_name}"]  # Rename columns
@@ -425,48 +439,48 @@ class SectorAnalysis():
     
     def industry_research_reports(self, industry_name=None):
 
-        indsutry = yf.Industry(key=industry_name)
-        rr = indsutry.research_reports
+        indsutry = gateway.industry(industry_name)
+        rr = gateway.get('Industry.research_reports', lambda: indsutry.research_reports)
         return rr
 
     def top_industry_companies(self, industry_name=None):
 
-        indsutry = yf.Industry(key=industry_name)
-        tc = indsutry.top_companies
+        indsutry = gateway.industry(industry_name)
+        tc = gateway.get('Industry.top_companies', lambda: indsutry.top_companies)
         return tc
 
     def top_industry_performing_companies(self, industry_name=None):
 
-        indsutry = yf.Industry(key=industry_name)
-        tpc = indsutry.top_performing_companies
+        indsutry = gateway.industry(industry_name)
+        tpc = gateway.get('Industry.top_performing_companies', lambda: indsutry.top_performing_companies)
         return tpc
 
     def top_industry_growth_companies(self, industry_name=None):
 
-        indsutry = yf.Industry(key=industry_name)
-        tgc = indsutry.top_growth_companies
+        indsutry = gateway.industry(industry_name)
+        tgc = gateway.get('Industry.top_growth_companies', lambda: indsutry.top_growth_companies)
         return tgc
 
     def sbh(self, reccomendation=None):
 
-        companies_df = pd.DataFrame()
-
         d = self.get_sectors_and_industries()
 
-        for x in d.Sector.unique():
-            dat = yf.Sector(x)
-            s_companies = dat.top_companies
-            s_companies = s_companies.reset_index()
-            companies_df = pd.concat([s_companies, companies_df])
-
-        for y in d.Industry.unique():
-            dat = yf.Industry(y)
-            i_companies = dat.top_companies
-            try:
-                i_companies = i_companies.reset_index()
-            except AttributeError as e:
-                continue
-            companies_df = pd.concat([i_companies, companies_df])
+        calls = [('Sector.top_companies', lambda key=x: gateway.sector(key).top_companies) for x in d.Sector.unique()]
+        calls += [('Industry.top_companies', lambda key=y: gateway.industry(key).top_companies) for y in d.Industry.unique()]
+
+        # The gateway throttles upstream, so fan out up to its concurrency limit
+        with ThreadPoolExecutor(max_workers=gateway.concurrency) as pool:
+            results = list(pool.map(lambda call: gateway.fetch(*call), calls))
+
+        frames = [result.data.reset_index() for result in results if result.ok]
+        failed = [result for result in results if result.failed]
+        if failed:
+            logger.warning("%d of %d sector/industry lookups failed", len(failed), len(results))
+        if not frames:
+            if failed and len(failed) == len(results):
+                failed[0].raise_for_status()
+            return pd.DataFrame(columns=['rating'])
+        companies_df = pd.concat(frames)
         companies_df = companies_df.sort_values(by='rating')
 
         if reccomendation == 'Strong Buy':
@@ -495,16 +509,16 @@ class MarketAnalysis():
     
     def market_summary(self, market_name=None):
 
-        market = yf.Market(market=market_name)
-        summary = market.summary
+        market = gateway.market(market_name)
+        summary = gateway.get('Market.summary', lambda: market.summary, default={})
         market_summary = pd.json_normalize(summary)
         market_summary = market_summary.transpose()
         return market_summary
 
     def market_status(self, market_name=None):
 
-        market = yf.Market(market=market_name)
-        status = market.status
+        market = gateway.market(market_name)
+        status = gateway.get('Market.status', lambda: market.status, default={})
         market_status = pd.json_normalize(status)
         market_status = market_status.transpose()
         return market_status
@@ -516,7 +530,11 @@ class Query():
 
     def search(self, query=None):
 
-        search = yf.Search(query=query).all
+        result = gateway.fetch('Search', lambda: gateway.search(query).all)
+        if not result.ok:
+            result.raise_for_status()
+            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        search = result.data
         quotes = pd.json_normalize(search['quotes'])
         news = pd.json_normalize(search['news'])
         lists = pd.json_normalize(search['lists'])
@@ -543,3 +561,6 @@ class LLM():
         for chunk in stream:
             print(chunk['message']['content'], end='', flush=True)
 
+# Latency / payload timers on every public method (PALADIN_METRICS=0 leaves them unwrapped)
+for _cls in (TickerAnalysis, SectorAnalysis, MarketAnalysis, Query):
+    metrics.instrument(_cls)